@@ -0,0 +1,169 @@
+"""
+Low-level file and memory helpers shared by the API key and config managers
+
+The managers are run as scripts and import this module as a top-level
+sibling, so python/utilities must be on sys.path (as it is when a script in
+it is run directly).
+"""
+import os
+import sys
+import ctypes
+import tempfile
+from typing import Any
+
+# Length of a url-safe base64 encoded 32-byte Fernet key
+FERNET_KEY_LENGTH = 44
+
+# Offset of the character data inside CPython bytes and compact ASCII str objects
+_DATA_OFFSETS = {bytes: sys.getsizeof(b'') - 1, str: sys.getsizeof('') - 1}
+
+def _probe_refcount(value: Any) -> int:
+    return sys.getrefcount(value)
+
+def _sole_owner_refcount() -> int:
+    probe = object()
+    return _probe_refcount(probe)
+
+# Reference count seen inside a helper when its caller holds the only reference
+_SOLE_OWNER_REFS = _sole_owner_refcount()
+
+def wipe_secret(value: Any):
+    """
+    Best-effort zeroing of a secret's buffer before it is freed
+    
+    Only CPython bytes and ASCII str objects longer than one character are
+    touched, and only when the caller holds the last reference, so a value
+    still in use elsewhere is never modified.
+    """
+    offset = _DATA_OFFSETS.get(type(value))
+    if (offset is None or sys.implementation.name != 'cpython' or len(value) < 2
+            or (type(value) is str and not value.isascii())):
+        return
+    if sys.getrefcount(value) != _SOLE_OWNER_REFS:
+        return
+    try:
+        ctypes.memset(id(value) + offset, 0, len(value))
+    except Exception:
+        pass
+
+def lock_in_memory(value: bytes):
+    """Best-effort pinning of a bytes object's buffer so it is never swapped to disk"""
+    if sys.implementation.name != 'cpython':
+        return
+    address = ctypes.c_void_p(id(value) + _DATA_OFFSETS[bytes])
+    size = ctypes.c_size_t(len(value))
+    try:
+        if os.name == 'nt':
+            ctypes.windll.kernel32.VirtualLock(address, size)
+        else:
+            ctypes.CDLL(None).mlock(address, size)
+    except Exception:
+        pass
+
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+def read_bytes(path: str) -> bytes:
+    """Read a small file whole with raw os-level calls, skipping Python's buffered IO"""
+    fd = os.open(path, _READ_FLAGS)
+    try:
+        remaining = os.fstat(fd).st_size
+        chunks = []
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+def read_fernet_key(key_file: str) -> bytes:
+    """Read an encryption key file, rejecting contents that can't be a Fernet key"""
+    encryption_key = read_bytes(key_file)
+    if len(encryption_key) != FERNET_KEY_LENGTH:
+        raise ValueError(f"Encryption key file {key_file} does not contain a valid Fernet key")
+    return encryption_key
+
+def write_temp(path: str, data: bytes, sync: bool = False) -> str:
+    """Write data to a new temporary file next to path and return its name, fsyncing it first if sync is set"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if sync:
+            os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    return tmp_path
+
+def atomic_write_bytes(path: str, data: bytes, sync: bool = False):
+    """
+    Replace path with data in one rename, so readers never see a partial file
+    
+    With sync set the data reaches disk before the rename; the rename itself
+    is only durable once the directory is flushed with fsync_dir.
+    """
+    tmp_path = write_temp(path, data, sync)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+def fsync_dir(path: str):
+    """Flush a directory's entries to disk (POSIX only; Windows can't open directories)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def create_file_once(path: str, data: bytes) -> bool:
+    """
+    Atomically create path with data unless it already exists
+    
+    Returns:
+        bool: False if another writer created path first
+    """
+    tmp_path = write_temp(path, data)
+    try:
+        # Unlike os.replace, a hard link never overwrites an existing file
+        os.link(tmp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # Filesystems without hard links (FAT/exFAT, some SMB/FUSE mounts)
+        pass
+    finally:
+        os.unlink(tmp_path)
+    return _create_file_exclusive(path, data)
+
+def _create_file_exclusive(path: str, data: bytes) -> bool:
+    """
+    Create path with data unless it already exists, without hard links
+    
+    The exclusive create still lets only one writer win, but a concurrent
+    reader may briefly see the file before all of data is written.
+    """
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o600)
+    except FileExistsError:
+        return False
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        os.unlink(path)
+        raise
+    os.close(fd)
+    return True
@@ -1,10 +1,135 @@
 import os
+import sys
 import json
+import logging
 import base64
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
 from cryptography.fernet import Fernet
-from typing import Dict, Optional
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from _secure_io import (
+    atomic_write_bytes, create_file_once, fsync_dir, lock_in_memory, read_bytes, read_fernet_key, wipe_secret
+)
+
+_log = logging.getLogger(__name__)
+
+# Loaded ciphers keyed by key file path, tagged with the file's mtime so a
+# rotated key is picked up while repeated managers skip the read and setup.
+# The cipher objects are stateless per call and shared by every manager and
+# thread; the lock is only taken to fill a missing entry.
+_CIPHER_CACHE: Dict[str, Tuple[int, bytes, Fernet, AESGCM]] = {}
+_CIPHER_LOCK = threading.Lock()
+
+# Stored key files start with this version byte followed by a 12-byte nonce
+# and the AES-GCM ciphertext. Files written before AES-GCM are Fernet tokens,
+# which always start with b'g' (base64 of the 0x80 version byte).
+_AESGCM_VERSION = b'\x01'
+_NONCE_SIZE = 12
+
+# Validation clients keyed by (service, SHA-256 of the API key), least recently
+# used first. The digest keeps the raw key out of the dict keys, but each client
+# holds its key, so only clients whose key validated are kept, and only a few.
+# SDKs configured through module-level state record the digest of the key they
+# were last given instead.
+_CLIENT_CACHE: 'OrderedDict[Tuple[str, bytes], Any]' = OrderedDict()
+_CLIENT_CACHE_SIZE = 4
+_CONFIGURED_KEYS: Dict[str, bytes] = {}
+
+# Number of decrypted API keys each manager keeps in memory
+_PLAINTEXT_CACHE_SIZE = 16
+
+def _derive_aead_key(encryption_key: bytes) -> bytes:
+    """Derive the AES-256-GCM key from the stored Fernet key"""
+    raw_key = base64.urlsafe_b64decode(encryption_key)
+    try:
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'langbois api key aes-gcm',
+        ).derive(raw_key)
+    finally:
+        wipe_secret(raw_key)
+
+def _load_ciphers(key_file: str, mtime_ns: int, encryption_key: Optional[bytes] = None) -> Tuple[int, bytes, Fernet, AESGCM]:
+    """
+    Build the cipher cache entry for a key file
+    
+    Args:
+        key_file (str): Path of the encryption key file
+        mtime_ns (int): Modification time the entry is tagged with
+        encryption_key (bytes, optional): Key already in memory, read from key_file if omitted
+    
+    Returns:
+        Tuple: (mtime_ns, encryption key, Fernet, AESGCM)
+    """
+    if encryption_key is None:
+        encryption_key = read_fernet_key(key_file)
+    
+    lock_in_memory(encryption_key)
+    aead_key = _derive_aead_key(encryption_key)
+    # AESGCM holds on to this bytes object and encrypts every API key with it
+    lock_in_memory(aead_key)
+    aead = AESGCM(aead_key)
+    return (mtime_ns, encryption_key, Fernet(encryption_key), aead)
+
+def _import_sdk(name: str):
+    """Return an SDK module, checking sys.modules before taking the import lock"""
+    module = sys.modules.get(name)
+    # A module another thread is still importing must go through the import system
+    if module is None or getattr(getattr(module, '__spec__', None), '_initializing', False):
+        module = importlib.import_module(name)
+    return module
+
+def _validate_openai(api_key: str):
+    """List models with the openai SDK, which is configured through module-level state"""
+    openai = _import_sdk('openai')
+    digest = hashlib.sha256(api_key.encode()).digest()
+    if _CONFIGURED_KEYS.get('openai') != digest:
+        openai.api_key = api_key
+        _CONFIGURED_KEYS['openai'] = digest
+    openai.Model.list()
+
+def _validate_google(api_key: str):
+    """List models with google.generativeai, which is configured through module-level state"""
+    genai = _import_sdk('google.generativeai')
+    digest = hashlib.sha256(api_key.encode()).digest()
+    if _CONFIGURED_KEYS.get('google') != digest:
+        genai.configure(api_key=api_key)
+        _CONFIGURED_KEYS['google'] = digest
+    genai.list_models()
+
+def _validate_anthropic(api_key: str):
+    """List models with an Anthropic client reused for this key"""
+    cache_key = ('anthropic', hashlib.sha256(api_key.encode()).digest())
+    client = _CLIENT_CACHE.pop(cache_key, None)
+    if client is None:
+        client = _import_sdk('anthropic').Anthropic(api_key=api_key)
+    client.models.list()
+    # Only reached when the key was accepted; re-insert as most recently used
+    _CLIENT_CACHE[cache_key] = client
+    while len(_CLIENT_CACHE) > _CLIENT_CACHE_SIZE:
+        _CLIENT_CACHE.popitem(last=False)
+
+# Validation call per service; each raises if the key is rejected. The SDKs
+# are imported on the first validation for their service, or when a manager
+# is created if LANGBOIS_PREIMPORT_SDKS is set.
+_VALIDATORS: Dict[str, Callable[[str], None]] = {
+    'openai': _validate_openai,
+    'google': _validate_google,
+    'anthropic': _validate_anthropic,
+}
+_SDK_MODULES = ('openai', 'google.generativeai', 'anthropic')
 
 class SecureAPIKeyManager:
+    _instances: Dict[str, 'SecureAPIKeyManager'] = {}
+    _instances_lock = threading.Lock()
+
     def __init__(self, key_storage_path: str = os.path.expanduser("~/.ai_api_keys")):
         """
         Initialize the API Key Manager with secure storage
@@ -13,8 +138,50 @@ class SecureAPIKeyManager:
             key_storage_path (str): Path to store encrypted API keys
         """
         self.key_storage_path = key_storage_path
+        # (directory mtime, services) from the last directory scan
+        self._listing_cache = (-1, [])
+        # Recently retrieved keys, least recently used first, each tagged with
+        # the (inode, mtime) of the key file it was decrypted from
+        self._plain_cache: 'OrderedDict[str, Tuple[Tuple[int, int], str]]' = OrderedDict()
         self._ensure_storage_dir()
         self._load_encryption_key()
+        
+        if os.environ.get('LANGBOIS_PREIMPORT_SDKS'):
+            self._preimport_sdks()
+
+    @classmethod
+    def instance(cls, key_storage_path: str = os.path.expanduser("~/.ai_api_keys")) -> 'SecureAPIKeyManager':
+        """
+        Return the process-wide manager for a storage path, creating it on first use
+        
+        Prefer this over constructing managers repeatedly: the storage
+        directory check, key load and in-memory key cache are shared by every
+        caller, and the ciphers are safe to use from several threads.
+        
+        Args:
+            key_storage_path (str): Path to store encrypted API keys
+        
+        Returns:
+            SecureAPIKeyManager: Manager shared by all callers using this path
+        """
+        path = os.path.abspath(key_storage_path)
+        manager = cls._instances.get(path)
+        if manager is None:
+            with cls._instances_lock:
+                manager = cls._instances.get(path)
+                if manager is None:
+                    manager = cls(key_storage_path)
+                    cls._instances[path] = manager
+        return manager
+
+    @staticmethod
+    def _preimport_sdks():
+        """Import the installed validation SDKs up front so threads don't contend on first use"""
+        for name in _SDK_MODULES:
+            try:
+                _import_sdk(name)
+            except ImportError:
+                pass
 
     def _ensure_storage_dir(self):
         """Ensure the key storage directory exists"""
@@ -28,15 +195,24 @@ class SecureAPIKeyManager:
         """
         key_file = os.path.join(self.key_storage_path, 'encryption.key')
         
+        encryption_key = None
         if not os.path.exists(key_file):
-            key = Fernet.generate_key()
-            with open(key_file, 'wb') as f:
-                f.write(key)
+            generated_key = Fernet.generate_key()
+            # If another process created the key first, its key is read below
+            if create_file_once(key_file, generated_key):
+                encryption_key = generated_key
         
-        with open(key_file, 'rb') as f:
-            self.encryption_key = f.read()
+        mtime_ns = os.stat(key_file).st_mtime_ns
+        cached = _CIPHER_CACHE.get(key_file)
+        if cached is None or cached[0] != mtime_ns:
+            with _CIPHER_LOCK:
+                # Another thread may have loaded the same key while we waited
+                cached = _CIPHER_CACHE.get(key_file)
+                if cached is None or cached[0] != mtime_ns:
+                    cached = _load_ciphers(key_file, mtime_ns, encryption_key)
+                    _CIPHER_CACHE[key_file] = cached
         
-        self.cipher_suite = Fernet(self.encryption_key)
+        _, self.encryption_key, self.cipher_suite, self._aead = cached
 
     def store_api_key(self, service: str, api_key: str):
         """
@@ -46,11 +222,42 @@ class SecureAPIKeyManager:
             service (str): Name of the service (e.g., 'openai', 'google')
             api_key (str): API key to store
         """
-        encrypted_key = self.cipher_suite.encrypt(api_key.encode())
+        self.store_api_keys_batch({service: api_key}, sync=False)
+
+    def store_api_keys_batch(self, items: Dict[str, str], sync: bool = True):
+        """
+        Securely store API keys for several services in one pass
         
-        key_file = os.path.join(self.key_storage_path, f'{service}_key.enc')
-        with open(key_file, 'wb') as f:
-            f.write(encrypted_key)
+        All keys are encrypted before any file is written, so a failure
+        leaves previously stored keys untouched.
+        
+        Args:
+            items (Dict[str, str]): Mapping of service name to API key
+            sync (bool): Flush each key file and then the storage directory to
+                disk, so the batch survives a crash
+        """
+        aead = self._aead
+        pending = []
+        for service, api_key in items.items():
+            nonce = os.urandom(_NONCE_SIZE)
+            # The service name is authenticated so a key file can't be swapped in for another service
+            plaintext = api_key.encode()
+            encrypted_key = _AESGCM_VERSION + nonce + aead.encrypt(nonce, plaintext, service.encode())
+            wipe_secret(plaintext)
+            pending.append((os.path.join(self.key_storage_path, f'{service}_key.enc'), encrypted_key))
+        
+        if not pending:
+            return
+        
+        for key_file, encrypted_key in pending:
+            atomic_write_bytes(key_file, encrypted_key, sync)
+        if sync:
+            # Each file's data is on disk before its rename; a single
+            # directory flush then persists all of the renames
+            fsync_dir(self.key_storage_path)
+        self._listing_cache = (-1, [])
+        for service in items:
+            self._forget_plaintext(service)
 
     def retrieve_api_key(self, service: str) -> Optional[str]:
         """
@@ -62,20 +269,95 @@ class SecureAPIKeyManager:
         Returns:
             Optional[str]: Decrypted API key or None if not found
         """
-        key_file = os.path.join(self.key_storage_path, f'{service}_key.enc')
+        return self.retrieve_api_keys_batch([service])[service]
+
+    def retrieve_api_keys_batch(self, services: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Retrieve decrypted API keys for several services in one pass
         
-        if not os.path.exists(key_file):
-            return None
+        Keys for the most recently used services are kept decrypted in memory
+        so repeated lookups skip the file read and decryption; a stat of the
+        key file still runs on every lookup, so a key replaced by another
+        process or manager is picked up. The key is in process memory
+        whenever it is used anyway; evicted entries are wiped on a
+        best-effort basis once no caller holds them.
         
-        with open(key_file, 'rb') as f:
-            encrypted_key = f.read()
+        Args:
+            services (Iterable[str]): Names of the services
         
-        try:
-            decrypted_key = self.cipher_suite.decrypt(encrypted_key).decode()
-            return decrypted_key
-        except Exception as e:
-            print(f"Error decrypting API key for {service}: {e}")
-            return None
+        Returns:
+            Dict[str, Optional[str]]: Decrypted API key per service, None if not found
+        """
+        keys = {}
+        plain_cache = self._plain_cache
+        for service in services:
+            key_file = os.path.join(self.key_storage_path, f'{service}_key.enc')
+            try:
+                stat = os.stat(key_file)
+            except FileNotFoundError:
+                self._forget_plaintext(service)
+                keys[service] = None
+                continue
+            # Atomic writes replace the file, so the inode changes even when
+            # the mtime resolution is too coarse to tell two writes apart
+            file_tag = (stat.st_ino, stat.st_mtime_ns)
+            
+            cached = plain_cache.pop(service, None)
+            if cached is not None:
+                if cached[0] == file_tag:
+                    # Re-insert as the most recently used entry
+                    plain_cache[service] = cached
+                    keys[service] = cached[1]
+                    continue
+                # The key file changed since this entry was cached
+                stale, cached = cached[1], None
+                wipe_secret(stale)
+            
+            try:
+                encrypted_key = read_bytes(key_file)
+            except FileNotFoundError:
+                keys[service] = None
+                continue
+            
+            try:
+                plaintext = self._decrypt(service, encrypted_key)
+                api_key = plaintext.decode()
+            except Exception as e:
+                if _log.isEnabledFor(logging.ERROR):
+                    _log.error("Error decrypting API key for %s: %s", service, type(e).__name__)
+                keys[service] = None
+                continue
+            # The str is what callers get; the intermediate bytes can go now
+            wipe_secret(plaintext)
+            
+            plain_cache[service] = (file_tag, api_key)
+            keys[service] = api_key
+            while len(plain_cache) > _PLAINTEXT_CACHE_SIZE:
+                _, (_, victim) = plain_cache.popitem(last=False)
+                wipe_secret(victim)
+        return keys
+
+    def _forget_plaintext(self, service: str):
+        """Drop and wipe the in-memory copy of a service's key, if any"""
+        _, victim = self._plain_cache.pop(service, (None, None))
+        if victim is not None:
+            wipe_secret(victim)
+
+    def _decrypt(self, service: str, encrypted_key: bytes) -> bytes:
+        """
+        Decrypt a stored key file, accepting both AES-GCM and legacy Fernet files
+        
+        Args:
+            service (str): Name of the service the file belongs to
+            encrypted_key (bytes): Raw contents of the key file
+        
+        Returns:
+            bytes: Decrypted API key
+        """
+        if encrypted_key[:1] == _AESGCM_VERSION:
+            nonce = encrypted_key[1:1 + _NONCE_SIZE]
+            return self._aead.decrypt(nonce, encrypted_key[1 + _NONCE_SIZE:], service.encode())
+        return self.cipher_suite.decrypt(encrypted_key)
 
     def list_stored_services(self) -> list:
         """
@@ -84,11 +366,12 @@ class SecureAPIKeyManager:
         Returns:
             list: Services with stored keys
         """
-        services = []
-        for filename in os.listdir(self.key_storage_path):
-            if filename.endswith('_key.enc'):
-                services.append(filename.replace('_key.enc', ''))
-        return services
+        mtime_ns = os.stat(self.key_storage_path).st_mtime_ns
+        if mtime_ns != self._listing_cache[0]:
+            with os.scandir(self.key_storage_path) as entries:
+                services = [entry.name[:-8] for entry in entries if entry.name.endswith('_key.enc')]
+            self._listing_cache = (mtime_ns, services)
+        return list(self._listing_cache[1])
 
     def delete_api_key(self, service: str):
         """
@@ -98,9 +381,11 @@ class SecureAPIKeyManager:
             service (str): Name of the service
         """
         key_file = os.path.join(self.key_storage_path, f'{service}_key.enc')
+        self._forget_plaintext(service)
         
         if os.path.exists(key_file):
             os.remove(key_file)
+            self._listing_cache = (-1, [])
 
     def validate_api_key(self, service: str, api_key: str) -> bool:
         """
@@ -113,29 +398,22 @@ class SecureAPIKeyManager:
         Returns:
             bool: Whether the API key is valid
         """
+        validator = _VALIDATORS.get(service)
         try:
-            if service == 'openai':
-                import openai
-                openai.api_key = api_key
-                openai.Model.list()
-            elif service == 'google':
-                import google.generativeai as genai
-                genai.configure(api_key=api_key)
-                genai.list_models()
-            elif service == 'anthropic':
-                from anthropic import Anthropic
-                client = Anthropic(api_key=api_key)
-                client.models.list()
+            if validator is not None:
+                validator(api_key)
             return True
         except Exception as e:
-            print(f"API key validation failed for {service}: {e}")
+            # Provider auth errors can echo the key, so only the exception type is logged
+            if _log.isEnabledFor(logging.ERROR):
+                _log.error("API key validation failed for %s: %s", service, type(e).__name__)
             return False
 
 def interactive_key_setup():
     """
     Interactive CLI for setting up and managing API keys
     """
-    manager = SecureAPIKeyManager()
+    manager = SecureAPIKeyManager.instance()
     
     while True:
         print("\n--- API Key Manager ---")
@@ -149,15 +427,21 @@ def interactive_key_setup():
         choice = input("Enter your choice (1-6): ")
         
         if choice == '1':
-            service = input("Enter service name (openai/google/anthropic): ").lower()
-            api_key = input("Enter API key: ")
-            manager.store_api_key(service, api_key)
-            print(f"API key for {service} stored successfully.")
+            pending = {}
+            while True:
+                service = input("Enter service name (openai/google/anthropic, or press Enter to finish): ").lower()
+                if not service:
+                    break
+                pending[service] = input("Enter API key: ")
+            manager.store_api_keys_batch(pending)
+            for service in pending:
+                print(f"API key for {service} stored successfully.")
         
         elif choice == '2':
-            service = input("Enter service name: ").lower()
-            key = manager.retrieve_api_key(service)
-            print(f"API key for {service}: {key}")
+            services = [s.strip() for s in input("Enter service name(s), comma-separated: ").lower().split(',') if s.strip()]
+            keys = manager.retrieve_api_keys_batch(services)
+            for service, key in keys.items():
+                print(f"API key for {service}: {key}")
         
         elif choice == '3':
             services = manager.list_stored_services()
@@ -181,5 +465,5 @@ def interactive_key_setup():
             print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
-    interactive_key_setup
+    interactive_key_setup()
 
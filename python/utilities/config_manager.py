@@ -1,8 +1,57 @@
 import os
 import json
 import yaml
-from typing import Dict, Any
+from json.encoder import encode_basestring_ascii as _encode_json_str
+from typing import Dict, Any, Optional, Tuple, Union
 from cryptography.fernet import Fernet
+from _secure_io import atomic_write_bytes, create_file_once, read_bytes, read_fernet_key, wipe_secret
+
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+# Loaded Fernet ciphers keyed by key file path and tagged with its mtime
+_CIPHER_CACHE: Dict[str, Tuple[int, bytes, Fernet]] = {}
+
+def _dump_json_bytes(data: Any) -> bytes:
+    """Serialize data to compact UTF-8 JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    if type(data) is dict and all(type(k) is str and type(v) is str for k, v in data.items()):
+        # Flat str -> str dicts, as built by the interactive CLI, skip the
+        # general encoder; the C string escaper keeps the output valid JSON
+        return ('{' + ','.join(
+            f'{_encode_json_str(k)}:{_encode_json_str(v)}' for k, v in data.items()
+        ) + '}').encode()
+    return json.dumps(data).encode()
+
+def _load_json_bytes(data: bytes) -> Any:
+    """Parse UTF-8 JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _deep_merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge src into dst in place, recursing into dicts present in both
+    
+    Uses an explicit stack rather than recursion.
+    """
+    stack = [(dst, src)]
+    while stack:
+        d, s = stack.pop()
+        for key, value in s.items():
+            if isinstance(value, dict) and isinstance(d.get(key), dict):
+                stack.append((d[key], value))
+            else:
+                d[key] = value
+    return dst
 
 class ConfigManager:
     """
@@ -17,6 +66,8 @@ class ConfigManager:
         """
         self.config_dir = config_dir or os.path.join(os.path.expanduser("~"), ".ai_config")
         os.makedirs(self.config_dir, exist_ok=True)
+        # (directory mtime, {config name: format}) from the last directory scan
+        self._listing_cache = (-1, {})
         
         # Encryption key management
         self.key_file = os.path.join(self.config_dir, "encryption.key")
@@ -26,72 +77,110 @@ class ConfigManager:
         """
         Load existing encryption key or generate a new one
         """
+        encryption_key = None
         if not os.path.exists(self.key_file):
-            key = Fernet.generate_key()
-            with open(self.key_file, 'wb') as f:
-                f.write(key)
+            generated_key = Fernet.generate_key()
+            # If another process created the key first, its key is read below
+            if create_file_once(self.key_file, generated_key):
+                encryption_key = generated_key
         
-                with open(self.key_file, 'rb') as f:
-                    self.encryption_key = f.read()
+        mtime_ns = os.stat(self.key_file).st_mtime_ns
+        cached = _CIPHER_CACHE.get(self.key_file)
+        if cached is None or cached[0] != mtime_ns:
+            if encryption_key is None:
+                encryption_key = read_fernet_key(self.key_file)
+            cached = (mtime_ns, encryption_key, Fernet(encryption_key))
+            _CIPHER_CACHE[self.key_file] = cached
         
-        self.cipher_suite = Fernet(self.encryption_key)
+        _, self.encryption_key, self.cipher_suite = cached
 
-    def save_config(self, config_name: str, config_data: Dict[str, Any], format: str = 'json', encrypt: bool = True):
+    def save_config(self, config_name: str, config_data: Union[Dict[str, Any], bytes, str], format: str = 'json', encrypt: bool = True):
         """
         Save configuration with optional encryption and format support
         
         Args:
             config_name (str): Name of the configuration
-            config_data (Dict): Configuration data
+            config_data (Dict, bytes or str): Configuration data, or an already serialized JSON document
             format (str): File format (json, yaml)
             encrypt (bool): Whether to encrypt the configuration
         """
         config_path = os.path.join(self.config_dir, f"{config_name}.{format}")
         
+        # Serialized JSON is stored as-is wherever the stored form is JSON
+        if isinstance(config_data, str):
+            config_data = config_data.encode()
+        serialized = isinstance(config_data, bytes)
+        if serialized and not encrypt and format != 'json':
+            config_data, serialized = _load_json_bytes(config_data), False
+        
         if encrypt:
-            # Convert config to JSON string and encrypt
-            json_data = json.dumps(config_data)
-            encrypted_data = self.cipher_suite.encrypt(json_data.encode())
-            
-            with open(config_path, 'wb') as f:
-                f.write(encrypted_data)
+            # Serialize config straight to JSON bytes and encrypt
+            plaintext = config_data if serialized else _dump_json_bytes(config_data)
+            payload = self.cipher_suite.encrypt(plaintext)
+            wipe_secret(plaintext)
+        elif serialized:
+            payload = config_data
+        elif format == 'json':
+            payload = json.dumps(config_data, indent=2).encode()
+        elif format == 'yaml':
+            payload = yaml.dump(config_data, Dumper=_YamlDumper, default_flow_style=False).encode()
         else:
-            # Save in specified format without encryption
-            with open(config_path, 'w') as f:
-                if format == 'json':
-                    json.dump(config_data, f, indent=2)
-                elif format == 'yaml':
-                    yaml.safe_dump(config_data, f, default_flow_style=False)
-
-    def load_config(self, config_name: str, format: str = 'json', decrypt: bool = True):
+            raise ValueError(f"Unsupported configuration format: {format}")
+        
+        atomic_write_bytes(config_path, payload)
+        self._listing_cache = (-1, {})
+
+    def load_config(self, config_name: str, format: Optional[str] = None, decrypt: bool = True):
         """
         Load configuration with optional decryption and format support
         
         Args:
             config_name (str): Name of the configuration
-            format (str): File format (json, yaml)
+            format (str, optional): File format (json, yaml), detected from the stored file if omitted
             decrypt (bool): Whether to decrypt the configuration
         
         Returns:
             Dict: Loaded configuration
         """
+        if format is None:
+            format = self._config_formats().get(config_name, 'json')
         config_path = os.path.join(self.config_dir, f"{config_name}.{format}")
         
-        if not os.path.exists(config_path):
-            raise FileNotFoundError(f"Configuration {config_name} not found")
+        try:
+            data = read_bytes(config_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Configuration {config_name} not found") from None
         
-        with open(config_path, 'rb' if decrypt else 'r') as f:
-            if decrypt:
-                # Decrypt and parse JSON
-                encrypted_data = f.read()
-                decrypted_data = self.cipher_suite.decrypt(encrypted_data)
-                return json.loads(decrypted_data)
-            else:
-                # Load based on format
-                if format == 'json':
-                    return json.load(f)
-                elif format == 'yaml':
-                    return yaml.safe_load(f)
+        if decrypt:
+            # Decrypt and parse JSON
+            plaintext = self.cipher_suite.decrypt(data)
+            config = _load_json_bytes(plaintext)
+            wipe_secret(plaintext)
+            return config
+        # Load based on format
+        if format == 'json':
+            return _load_json_bytes(data)
+        elif format == 'yaml':
+            return yaml.load(data, Loader=_YamlLoader)
+
+    def _config_formats(self) -> Dict[str, str]:
+        """
+        Map each stored configuration name to its file format
+        
+        Returns:
+            Dict[str, str]: Configuration name to format, preferring json for
+            a config saved in both formats
+        """
+        mtime_ns = os.stat(self.config_dir).st_mtime_ns
+        if mtime_ns != self._listing_cache[0]:
+            formats = {}
+            with os.scandir(self.config_dir) as entries:
+                for entry in entries:
+                    name, ext = os.path.splitext(entry.name)
+                    if ext == '.json' or (ext == '.yaml' and name not in formats):
+                        formats[name] = ext[1:]
+            self._listing_cache = (mtime_ns, formats)
+        return self._listing_cache[1]
 
     def list_configs(self):
         """
@@ -100,11 +189,7 @@ class ConfigManager:
         Returns:
             List[str]: Configuration names
         """
-        configs = []
-        for filename in os.listdir(self.config_dir):
-            if filename != "encryption.key":
-                configs.append(os.path.splitext(filename))
-        return configs
+        return list(self._config_formats())
 
     def delete_config(self, config_name: str):
         """
@@ -113,11 +198,12 @@ class ConfigManager:
         Args:
             config_name (str): Name of the configuration to delete
         """
-        config_path = os.path.join(self.config_dir, f"{config_name}.*")
-        import glob
-        
-        for file in glob.glob(config_path):
-            os.remove(file)
+        for fmt in ('json', 'yaml'):
+            try:
+                os.unlink(os.path.join(self.config_dir, f"{config_name}.{fmt}"))
+            except FileNotFoundError:
+                pass
+        self._listing_cache = (-1, {})
 
     def merge_configs(self, base_config: str, overlay_config: str):
         """
@@ -133,17 +219,8 @@ class ConfigManager:
         base = self.load_config(base_config)
         overlay = self.load_config(overlay_config)
         
-        def deep_merge(dict1, dict2):
-            """Recursively merge two dictionaries"""
-            for key, value in dict2.items():
-                if isinstance(value, dict) and key in dict1 and isinstance(dict1[key], dict):
-                                        deep_merge(dict1[key], value)
-                else:
-                    dict1[key] = value
-            return dict1
-
-        merged_config = deep_merge(base.copy(), overlay)
-        return merged_config
+        # Both configs are freshly loaded, so base can be merged into in place
+        return _deep_merge(base, overlay)
 
 def interactive_config_manager():
     """
@@ -1,59 +1,178 @@
+import os
 import sys
+import shutil
+import json
+import math
+import time
 import platform
+import functools
+import importlib
+from importlib import metadata
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import psutil
-import GPUtil
-import torch
-import transformers
-import langchain
 
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import pynvml
+except ImportError:  # optional; GPU details report an error without it
+    pynvml = None
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # optional; NumPy keeps its default BLAS thread count
+    threadpool_limits = None
+
+try:
+    from cpuinfo import get_cpu_info
+except ImportError:  # optional; the CPU name falls back to platform.processor()
+    get_cpu_info = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional; the Numba benchmark is skipped without it
+    njit = None
+
+@functools.lru_cache(maxsize=None)
+def _lazy(name):
+    """
+    Import a module on first use
+    
+    torch, transformers and langchain take seconds to import, so they are
+    only loaded by the functions that actually need them.
+    """
+    return importlib.import_module(name)
+
+@functools.lru_cache(maxsize=None)
+def _report_dir():
+    """Resolve and create the output directory for reports and exports once"""
+    report_dir = Path.home() / "AIDevDiagnostics"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    return report_dir
+
+def _dump_json_bytes(data):
+    """Serialize data to indented UTF-8 JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2).encode()
+
+# The collectors below describe the machine, which doesn't change during a
+# run, so each is computed once and later callers share the result; call
+# clear_caches() to force fresh measurements.
+
+@functools.lru_cache(maxsize=None)
 def get_system_info():
     """Collect comprehensive system information"""
+    memory = psutil.virtual_memory()
+    cpu = get_cpu_details()
+    # os.sep resolves to the root of the current drive, so this works on Windows too
+    disk = shutil.disk_usage(os.path.abspath(os.sep))
     return {
         "OS": platform.platform(),
         "Python Version": platform.python_version(),
         "CPU": {
-            "Name": platform.processor(),
+            "Name": cpu["Name"],
             "Cores": psutil.cpu_count(logical=False),
-            "Logical Cores": psutil.cpu_count(logical=True)
+            "Logical Cores": psutil.cpu_count(logical=True),
+            "Flags": cpu["Flags"]
         },
         "Memory": {
-            "Total": f"{psutil.virtual_memory().total / (1024**3):.2f} GB",
-            "Available": f"{psutil.virtual_memory().available / (1024**3):.2f} GB"
+            "Total": f"{memory.total / (1024**3):.2f} GB",
+            "Available": f"{memory.available / (1024**3):.2f} GB",
+            "Total Bytes": memory.total
+        },
+        "Disk": {
+            "Total": disk.total,
+            "Free": disk.free
         },
         "GPU": get_gpu_info(),
         "Libraries": get_library_versions()
     }
 
+# SIMD extensions that decide which BLAS/oneDNN kernels a CPU can use
+_CPU_FEATURE_FLAGS = ("avx2", "avx512f", "avx512_vnni", "sha_ni", "amx_bf16")
+
+@functools.lru_cache(maxsize=None)
+def get_cpu_details():
+    """Identify the CPU brand and its relevant SIMD flags via py-cpuinfo"""
+    if get_cpu_info is None:
+        return {"Name": platform.processor(), "Flags": []}
+    info = get_cpu_info()
+    flags = set(info.get("flags", ()))
+    return {
+        "Name": info.get("brand_raw") or platform.processor(),
+        "Flags": [flag for flag in _CPU_FEATURE_FLAGS if flag in flags]
+    }
+
+def _numpy_blas_name():
+    """Name of the BLAS library NumPy was built against, or "" if unknown"""
+    try:
+        return np.show_config(mode="dicts")["Build Dependencies"]["blas"]["name"].lower()
+    except Exception:
+        return ""
+
+@functools.lru_cache(maxsize=None)
+def _nvml_handles():
+    """Initialize NVML once and return the device handles for every GPU"""
+    pynvml.nvmlInit()
+    return tuple(pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount()))
+
+def _nvml_str(value):
+    """Older pynvml releases return bytes rather than str"""
+    return value.decode() if isinstance(value, bytes) else value
+
 def get_gpu_info():
     """Retrieve GPU information"""
     try:
-        gpus = GPUtil.getGPUs()
+        if pynvml is None:
+            raise ImportError("pynvml is not installed")
+        handles = _nvml_handles()
+        driver = _nvml_str(pynvml.nvmlSystemGetDriverVersion())
         gpu_info = []
-        for gpu in gpus:
+        for handle in handles:
+            memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
             gpu_info.append({
-                "Name": gpu.name,
-                "Driver": gpu.driver,
-                "Memory": f"{gpu.memoryTotal} MB",
-                "GPU Utilization": f"{gpu.load*100:.2f}%",
-                "Memory Utilization": f"{gpu.memoryUtil*100:.2f}%"
+                "Name": _nvml_str(pynvml.nvmlDeviceGetName(handle)),
+                "Driver": driver,
+                "Memory": f"{memory.total / 1024**2:.0f} MB",
+                "Memory Total MB": memory.total // 1024**2,
+                "GPU Utilization": f"{utilization.gpu:.2f}%",
+                "Memory Utilization": f"{memory.used / memory.total * 100:.2f}%"
             })
         return gpu_info
     except Exception as e:
         return [{"Error": str(e)}]
 
+@functools.lru_cache(maxsize=None)
 def get_library_versions():
     """Collect versions of key AI and ML libraries"""
+    # Read the installed distribution metadata rather than importing each
+    # package just for its __version__
+    def installed_version(package):
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            return "not installed"
+
+    packages = [("PyTorch", "torch"), ("Transformers", "transformers"), ("LangChain", "langchain"),
+                ("NumPy", "numpy"), ("Pandas", "pandas")]
     return {
         "Python": sys.version,
-        "PyTorch": torch.__version__,
-        "Transformers": transformers.__version__,
-        "LangChain": langchain.__version__,
-        "NumPy": __import__('numpy').__version__,
-        "Pandas": __import__('pandas').__version__
+        **{lib: installed_version(package) for lib, package in packages}
     }
 
+@functools.lru_cache(maxsize=None)
 def check_cuda_availability():
     """Check CUDA availability and device details"""
+    torch = _lazy("torch")
     cuda_info = {
         "CUDA Available": torch.cuda.is_available(),
         "CUDA Version": torch.version.cuda if torch.cuda.is_available() else "N/A",
@@ -70,77 +189,202 @@ def check_cuda_availability():
     
     return cuda_info
 
+@functools.lru_cache(maxsize=None)
 def performance_benchmark():
     """Run basic performance benchmarks"""
-    import time
-    import numpy as np
-    import torch
+    if _lazy("torch").cuda.is_available():
+        # The GPU matmul doesn't compete with NumPy's BLAS threads for the
+        # CPU, so run the two side by side
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            torch_future = pool.submit(torch_benchmark)
+            numpy_results = numpy_benchmark()
+            torch_results = torch_future.result()
+    else:
+        # On CPU both matmuls use every core; overlapping them would only
+        # make each timing slower
+        numpy_results = numpy_benchmark()
+        torch_results = torch_benchmark()
 
     benchmarks = {
-        "NumPy Matrix Multiplication": numpy_benchmark(),
-        "PyTorch Matrix Multiplication": torch_benchmark(),
-        "Python List Comprehension": python_list_benchmark()
+        "NumPy Matrix Multiplication": numpy_results,
+        "PyTorch Matrix Multiplication": torch_results,
+        "Python List Comprehension": python_list_benchmark(),
+        "NumPy Vectorized Square": numpy_vectorized_benchmark(),
+        "Numba Parallel Square Sum": numba_benchmark()
     }
     
     return benchmarks
 
+def clear_caches():
+    """Discard memoized diagnostics so the next call re-collects them"""
+    for collector in (get_system_info, get_cpu_details, get_library_versions, check_cuda_availability, performance_benchmark):
+        collector.cache_clear()
+
+def _pick_matmul_size(device, dtype_bytes=4):
+    """
+    Choose a square matmul size that fits comfortably in memory
+    
+    Args:
+        device: torch.device or device type string the matrices live on
+        dtype_bytes (int): Size of one matrix element in bytes
+    
+    Returns:
+        int: Largest N whose three NxN operands use under a quarter of the
+        available memory, clamped to [512, 8192]
+    """
+    if getattr(device, "type", device) == "cuda":
+        available, _ = _lazy("torch").cuda.mem_get_info(device)
+    else:
+        available = psutil.virtual_memory().available
+    matrix_size = math.isqrt(int(0.25 * available / (3 * dtype_bytes)))
+    return max(512, min(8192, matrix_size))
+
 def numpy_benchmark():
     """NumPy matrix multiplication benchmark"""
-    start = time.time()
-    matrix_size = 5000
+    # Pin BLAS to one thread per physical core so timings don't depend on
+    # whatever oversubscribed default the library picked
+    blas_threads = psutil.cpu_count(logical=False) or psutil.cpu_count()
+    limiter = (threadpool_limits(limits=blas_threads, user_api="blas")
+               if threadpool_limits is not None else contextlib.nullcontext())
+    # Size and fill the inputs outside the timed region, as torch_benchmark does
+    matrix_size = _pick_matmul_size("cpu", dtype_bytes=8)
     a = np.random.rand(matrix_size, matrix_size)
     b = np.random.rand(matrix_size, matrix_size)
-    c = np.matmul(a, b)
-    end = time.time()
+    with limiter:
+        start = time.perf_counter_ns()
+        c = np.matmul(a, b)
+        end = time.perf_counter_ns()
     return {
-        "Time": f"{end - start:.4f} seconds",
-        "Matrix Size": f"{matrix_size}x{matrix_size}"
+        "Time": f"{(end - start) / 1e9:.4f} seconds",
+        "Matrix Size": f"{matrix_size}x{matrix_size}",
+        "N": matrix_size,
+        "BLAS Threads": blas_threads if threadpool_limits is not None else "default"
     }
 
-def torch_benchmark():
-    """PyTorch matrix multiplication benchmark"""
-    start = time.time()
-    matrix_size = 5000
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    a = torch.rand(matrix_size, matrix_size, device=device)
-    b = torch.rand(matrix_size, matrix_size, device=device)
-    c = torch.matmul(a, b)
-    end = time.time()
+@contextlib.contextmanager
+def _tf32_enabled(torch):
+    """Enable TF32 matmuls, restoring the previous process-wide settings on exit"""
+    previous = (torch.backends.cuda.matmul.allow_tf32, torch.backends.cudnn.allow_tf32,
+                torch.get_float32_matmul_precision())
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+    try:
+        yield
+    finally:
+        torch.backends.cuda.matmul.allow_tf32, torch.backends.cudnn.allow_tf32, precision = previous
+        torch.set_float32_matmul_precision(precision)
+
+def torch_benchmark(iterations=10):
+    """
+    PyTorch matrix multiplication benchmark
+    
+    Inputs and output are allocated once outside the timed region. On CUDA
+    the matmul is captured in a CUDA graph and replayed, so the timing
+    reflects steady-state throughput rather than allocation and per-launch
+    overhead. On CPU a single matmul is timed after one warm-up run.
+    
+    Args:
+        iterations (int): Number of timed CUDA graph replays
+    """
+    torch = _lazy("torch")
+
+    # Let float32 matmuls run on tensor cores (Ampere and newer) for the
+    # duration of the benchmark only
+    with _tf32_enabled(torch):
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        matrix_size = _pick_matmul_size(device, dtype_bytes=4)
+        a = torch.rand(matrix_size, matrix_size, dtype=torch.float32, device=device)
+        b = torch.rand(matrix_size, matrix_size, dtype=torch.float32, device=device)
+        c = torch.empty(matrix_size, matrix_size, dtype=torch.float32, device=device)
+
+        if device.type == "cuda":
+            # Graph capture requires warm-up on a side stream
+            side_stream = torch.cuda.Stream()
+            side_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(side_stream):
+                for _ in range(3):
+                    torch.matmul(a, b, out=c)
+            torch.cuda.current_stream().wait_stream(side_stream)
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                torch.matmul(a, b, out=c)
+            torch.cuda.synchronize()
+
+            # CUDA events time the kernels on the device itself instead of
+            # host-side dispatch
+            start_event = torch.cuda.Event(enable_timing=True)
+            end_event = torch.cuda.Event(enable_timing=True)
+            start_event.record()
+            for _ in range(iterations):
+                graph.replay()
+            end_event.record()
+            torch.cuda.synchronize()
+            elapsed = start_event.elapsed_time(end_event) / 1e3
+        else:
+            # There is no launch overhead to amortize on CPU, and repeating a
+            # matmul this large would only stretch the run
+            iterations = 1
+            torch.matmul(a, b, out=c)
+            start = time.perf_counter_ns()
+            torch.matmul(a, b, out=c)
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+        tf32 = device.type == "cuda" and torch.backends.cuda.matmul.allow_tf32
+
     return {
-        "Time": f"{end - start:.4f} seconds",
+        "Time": f"{elapsed:.4f} seconds",
         "Matrix Size": f"{matrix_size}x{matrix_size}",
-        "Device": str(device)
+        "N": matrix_size,
+        "Device": str(device),
+        "Data Type": "float32",
+        "TF32": tf32,
+        "Iterations": iterations,
+        "GFLOPS": f"{2 * matrix_size**3 * iterations / elapsed / 1e9:.1f}"
     }
 
 def python_list_benchmark():
     """Python list comprehension benchmark"""
-    start = time.time()
+    start = time.perf_counter_ns()
     result = [x**2 for x in range(10_000_000)]
-    end = time.time()
+    end = time.perf_counter_ns()
     return {
-        "Time": f"{end - start:.4f} seconds",
+        "Time": f"{(end - start) / 1e9:.4f} seconds",
         "List Size": "10 million elements"
     }
 
-def main():
-    """Main diagnostic function to print all system information"""
-    print("=== System Diagnostics ===")
-    
-    system_info = get_system_info()
-    print("\n--- System Information ---")
-    import json
-    print(json.dumps(system_info, indent=2))
-
-    print("\n--- CUDA Availability ---")
-    cuda_info = check_cuda_availability()
-    print(json.dumps(cuda_info, indent=2))
-
-    print("\n--- Performance Benchmarks ---")
-    benchmarks = performance_benchmark()
-    print(json.dumps(benchmarks, indent=2))
+def numpy_vectorized_benchmark():
+    """NumPy vectorized square over the same range as python_list_benchmark"""
+    start = time.perf_counter_ns()
+    arr = np.arange(10_000_000, dtype=np.int64)
+    result = np.square(arr)
+    end = time.perf_counter_ns()
+    return {
+        "Time": f"{(end - start) / 1e9:.4f} seconds",
+        "Array Size": "10 million elements"
+    }
 
-    # Optional: Generate a comprehensive report
-    generate_diagnostic_report(system_info, cuda_info, benchmarks)
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _square_sum(n):
+        total = 0.0
+        for i in prange(n):
+            total += i * i
+        return total
+
+def numba_benchmark():
+    """Numba parallel sum of squares over the same range as python_list_benchmark"""
+    if njit is None:
+        return {"Error": "numba is not installed"}
+    # Compile (or load from the on-disk cache) outside the timed region
+    _square_sum(1_000)
+    start = time.perf_counter_ns()
+    result = _square_sum(10_000_000)
+    end = time.perf_counter_ns()
+    return {
+        "Time": f"{(end - start) / 1e9:.4f} seconds",
+        "Range Size": "10 million elements"
+    }
 
 def generate_diagnostic_report(system_info, cuda_info, benchmarks):
     """
@@ -151,83 +395,79 @@ def generate_diagnostic_report(system_info, cuda_info, benchmarks):
         cuda_info (dict): CUDA availability details
         benchmarks (dict): Performance benchmark results
     """
-    import os
-    from datetime import datetime
+    now = datetime.now()
+    report_path = _report_dir() / f"system_diagnostic_report_{now.strftime('%Y%m%d_%H%M%S')}.md"
+
+    # Assemble the whole report in memory and write it with a single call
+    report = []
+
+    # Report Header
+    report.append(f"# AI Development Environment Diagnostic Report\n")
+    report.append(f"**Generated:** {now}\n\n")
 
-    report_dir = os.path.join(os.path.expanduser("~"), "AIDevDiagnostics")
-    os.makedirs(report_dir, exist_ok=True)
+    # System Information Section
+    report.append("## System Information\n")
+    report.append(f"- **Operating System:** {system_info['OS']}\n")
+    report.append(f"- **Python Version:** {system_info['Python Version']}\n")
+    
+    # CPU Details
+    report.append("### CPU\n")
+    report.append(f"- **Name:** {system_info['CPU']['Name']}\n")
+    report.append(f"- **Physical Cores:** {system_info['CPU']['Cores']}\n")
+    report.append(f"- **Logical Cores:** {system_info['CPU']['Logical Cores']}\n")
+
+    # Memory Details
+    report.append("### Memory\n")
+    report.append(f"- **Total Memory:** {system_info['Memory']['Total']}\n")
+    report.append(f"- **Available Memory:** {system_info['Memory']['Available']}\n")
+
+    # Disk Details
+    report.append("### Disk\n")
+    report.append(f"- **Total Space:** {system_info['Disk']['Total'] / (1024**3):.2f} GB\n")
+    report.append(f"- **Free Space:** {system_info['Disk']['Free'] / (1024**3):.2f} GB\n")
+
+    # GPU Details
+    report.append("## GPU Information\n")
+    for gpu in system_info['GPU']:
+        report.append(f"### {gpu.get('Name', 'N/A')}\n")
+        report.append(f"- **Driver:** {gpu.get('Driver', 'N/A')}\n")
+        report.append(f"- **Memory:** {gpu.get('Memory', 'N/A')}\n")
+        report.append(f"- **GPU Utilization:** {gpu.get('GPU Utilization', 'N/A')}\n")
+        report.append(f"- **Memory Utilization:** {gpu.get('Memory Utilization', 'N/A')}\n")
+
+    # CUDA Information
+    report.append("## CUDA Availability\n")
+    report.append(f"- **CUDA Available:** {cuda_info['CUDA Available']}\n")
+    report.append(f"- **CUDA Version:** {cuda_info['CUDA Version']}\n")
+    report.append(f"- **cuDNN Version:** {cuda_info['cuDNN Version']}\n")
+
+    if cuda_info['CUDA Available']:
+        report.append("### CUDA Devices\n")
+        for device in cuda_info.get('CUDA Devices', []):
+            report.append(f"- **Name:** {device['Name']}\n")
+            report.append(f"  - **Compute Capability:** {device['Compute Capability']}\n")
+
+    # Performance Benchmarks Section
+    report.append("## Performance Benchmarks\n")
+    
+    for benchmark_name, results in benchmarks.items():
+        report.append(f"\n### {benchmark_name}\n")
+        for key, value in results.items():
+            report.append(f"- **{key}:** {value}\n")
+
+    # Library Versions
+    report.append("\n## Installed Library Versions\n")
+    for lib, version in system_info['Libraries'].items():
+        report.append(f"- **{lib}:** {version}\n")
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = os.path.join(report_dir, f"system_diagnostic_report_{timestamp}.md")
+    # Recommendations Section
+    report.append("\n## Recommendations\n")
+    recommendations = generate_recommendations(system_info, cuda_info)
+    for recommendation in recommendations:
+        report.append(f"- {recommendation}\n")
 
     with open(report_path, 'w') as report_file:
-        # Report Header
-        report_file.write(f"# AI Development Environment Diagnostic Report\n")
-        report_file.write(f"**Generated:** {datetime.now()}\n\n")
-
-        # System Information Section
-        report_file.write("## System Information\n")
-        report_file.write(f"- **Operating System:** {system_info['OS']}\n")
-        report_file.write(f"- **Python Version:** {system_info['Python Version']}\n")
-        
-        # CPU Details
-        report_file.write("### CPU\n")
-        report_file.write(f"- **Name:** {system_info['CPU']['Name']}\n")
-        report_file.write(f"- **Physical Cores:** {system_info['CPU']['Cores']}\n")
-        report_file.write(f"- **Logical Cores:** {system_info['CPU']['Logical Cores']}\n")
-
-        # Memory Details
-        report_file.write("### Memory\n")
-        report_file.write(f"- **Total Memory:** {system_info['Memory']['Total']}\n")
-        report_file.write(f"- **Available Memory:** {system_info['Memory']['Available']}\n")
-
-        # GPU Details
-        report_file.write("## GPU Information\n")
-        for gpu in system_info['GPU']:
-            report_file.write(f"### {gpu['Name']}\n")
-            report_file.write(f"- **Driver:** {gpu.get('Driver', 'N/A')}\n")
-            report_file.write(f"- **Memory:** {gpu.get('Memory', 'N/A')}\n")
-            report_file.write(f"- **GPU Utilization:** {gpu.get('GPU Utilization', 'N/A')}\n")
-            report_file.write(f"- **Memory Utilization:** {gpu.get('Memory Utilization', 'N/A')}\n")
-
-        # CUDA Information
-        report_file.write("## CUDA Availability\n")
-        report_file.write(f"- **CUDA Available:** {cuda_info['CUDA Available']}\n")
-        report_file.write(f"- **CUDA Version:** {cuda_info['CUDA Version']}\n")
-        report_file.write(f"- **cuDNN Version:** {cuda_info['cuDNN Version']}\n")
-
-        if cuda_info['CUDA Available']:
-            report_file.write("### CUDA Devices\n")
-            for device in cuda_info.get('CUDA Devices', []):
-                report_file.write(f"- **Name:** {device['Name']}\n")
-                report_file.write(f"  - **Compute Capability:** {device['Compute Capability']}\n")
-
-                # Performance Benchmarks Section
-        report_file.write("## Performance Benchmarks\n")
-        
-        report_file.write("### NumPy Matrix Multiplication\n")
-        for key, value in benchmarks['NumPy Matrix Multiplication'].items():
-            report_file.write(f"- **{key}:** {value}\n")
-        
-        report_file.write("\n### PyTorch Matrix Multiplication\n")
-        for key, value in benchmarks['PyTorch Matrix Multiplication'].items():
-            report_file.write(f"- **{key}:** {value}\n")
-        
-        report_file.write("\n### Python List Comprehension\n")
-        for key, value in benchmarks['Python List Comprehension'].items():
-            report_file.write(f"- **{key}:** {value}\n")
-
-        # Library Versions
-        report_file.write("\n## Installed Library Versions\n")
-        library_versions = get_library_versions()
-        for lib, version in library_versions.items():
-            report_file.write(f"- **{lib}:** {version}\n")
-
-        # Recommendations Section
-        report_file.write("\n## Recommendations\n")
-        recommendations = generate_recommendations(system_info, cuda_info)
-        for recommendation in recommendations:
-            report_file.write(f"- {recommendation}\n")
+        report_file.write("".join(report))
 
     print(f"\nDiagnostic report generated: {report_path}")
     return report_path
@@ -246,16 +486,18 @@ def generate_recommendations(system_info, cuda_info):
     recommendations = []
 
     # Memory Recommendations
-    total_memory = float(system_info['Memory']['Total'].replace(' GB', ''))
+    # Work from the raw numbers rather than parsing the display strings
+    total_memory = system_info['Memory']['Total Bytes'] / (1024**3)
     if total_memory < 32:
-        recommendations.append(f"Consider upgrading RAM. Current total memory is {total_memory} GB, which may be insufficient for complex AI workloads.")
+        recommendations.append(f"Consider upgrading RAM. Current total memory is {total_memory:.2f} GB, which may be insufficient for complex AI workloads.")
 
     # GPU Recommendations
     if not cuda_info['CUDA Available']:
         recommendations.append("No CUDA-compatible GPU detected. Consider using a CUDA-enabled GPU for accelerated computing.")
     else:
-        gpu_memory = [gpu.get('Memory', '0 MB') for gpu in system_info['GPU']]
-        if any(int(mem.split()) < 8192 for mem in gpu_memory):
+        # Entries that only carry an error have no size to judge
+        gpu_memory = [gpu['Memory Total MB'] for gpu in system_info['GPU'] if 'Memory Total MB' in gpu]
+        if any(mem < 8192 for mem in gpu_memory):
             recommendations.append("Consider upgrading GPU with more than 8GB VRAM for better AI/ML performance.")
 
     # Python and Library Recommendations
@@ -263,10 +505,15 @@ def generate_recommendations(system_info, cuda_info):
     if not python_version.startswith(('3.9', '3.10', '3.11')):
         recommendations.append(f"Consider upgrading Python. Current version {python_version} may not be optimal for latest AI libraries.")
 
+    # CPU Recommendations
+    if "avx512f" in system_info['CPU'].get('Flags', []):
+        blas = _numpy_blas_name()
+        # An unknown BLAS (NumPy < 1.26 can't report it) may well be MKL already
+        if blas and not any(name in blas for name in ("mkl", "openblas")):
+            recommendations.append(f"CPU supports AVX-512 but NumPy's BLAS ({blas}) may not use it. Consider a NumPy build linked against MKL or OpenBLAS.")
+
     # Storage Recommendations
-    import shutil
-    total, used, free = shutil.disk_usage("/")
-    free_gb = free // (2**30)
+    free_gb = system_info['Disk']['Free'] // (2**30)
     if free_gb < 100:
         recommendations.append(f"Low disk space. Only {free_gb} GB free. Recommended to have at least 100 GB for AI development.")
 
@@ -276,30 +523,25 @@ def generate_recommendations(system_info, cuda_info):
 
     return recommendations
 
-def export_system_info_json():
+def export_system_info_json(system_info, cuda_info, benchmarks):
     """
     Export system information to a JSON file for potential future use
+    
+    Args:
+        system_info (dict): Collected system information
+        cuda_info (dict): CUDA availability details
+        benchmarks (dict): Performance benchmark results
     """
-    import json
-    import os
-
-    system_info = get_system_info()
-    cuda_info = check_cuda_availability()
-    benchmarks = performance_benchmark()
-
     export_data = {
         "system_info": system_info,
         "cuda_info": cuda_info,
         "benchmarks": benchmarks
     }
 
-    export_dir = os.path.join(os.path.expanduser("~"), "AIDevDiagnostics")
-    os.makedirs(export_dir, exist_ok=True)
-
-    export_path = os.path.join(export_dir, f"system_diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    export_path = _report_dir() / f"system_diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     
-    with open(export_path, 'w') as f:
-        json.dump(export_data, f, indent=2)
+    with open(export_path, 'wb') as f:
+        f.write(_dump_json_bytes(export_data))
     
     print(f"System information exported to: {export_path}")
     return export_path
@@ -308,53 +550,97 @@ def continuous_monitoring():
     """
     Set up a continuous monitoring service for system resources
     Logs system performance metrics periodically
+    
+    Returns:
+        Tuple[threading.Thread, Callable[[], None]]: The running monitor
+        thread and a function that stops it and flushes its log; the stop
+        function also runs at interpreter exit
     """
-    import time
+    import queue
+    import atexit
     import logging
-    from threading import Thread
+    from logging.handlers import QueueHandler, QueueListener
+    from threading import Event, Thread
+
+    # Records go through a queue to a listener thread that owns the file
+    # handler, so disk writes never hold up the sampler
+    logger = logging.getLogger("ai_dev_system_monitor")
+    listener = None
+    if not logger.handlers:
+        file_handler = logging.FileHandler('ai_dev_system_monitor.log')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    # Prime the CPU counter; each later non-blocking call reports usage
+    # since the previous one, so the sleep itself is the sampling window
+    psutil.cpu_percent(interval=None)
+
+    # Reuse the cached NVML handles; NVML reports device-wide usage, unlike
+    # torch's allocator counters which only see this process
+    try:
+        gpu_handles = _nvml_handles() if pynvml is not None else ()
+    except Exception:
+        gpu_handles = ()
 
-    logging.basicConfig(
-        filename='ai_dev_system_monitor.log', 
-        level=logging.INFO, 
-        format='%(asctime)s - %(message)s'
-    )
+    stop_event = Event()
 
     def monitor_resources():
-        while True:
+        # Wait 5 minutes between samples, waking immediately once stopped
+        while not stop_event.wait(300):
+
             # CPU Usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            logging.info(f"CPU Usage: {cpu_percent}%")
+            cpu_percent = psutil.cpu_percent(interval=None)
+            logger.info("CPU Usage: %s%%", cpu_percent)
 
             # Memory Usage
             memory = psutil.virtual_memory()
-            logging.info(f"Memory Usage: {memory.percent}%")
+            logger.info("Memory Usage: %s%%", memory.percent)
 
             # GPU Usage (if available)
-            if torch.cuda.is_available():
-                gpu_memory = torch.cuda.memory_allocated() / torch.cuda.max_memory_allocated() * 100
-                logging.info(f"GPU Memory Usage: {gpu_memory:.2f}%")
-
-            # Sleep for 5 minutes
-            time.sleep(300)
+            for index, handle in enumerate(gpu_handles):
+                gpu_memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+                logger.info("GPU %d Memory Usage: %.2f%%", index, gpu_memory.used / gpu_memory.total * 100)
 
     # Start monitoring in a separate thread
     monitor_thread = Thread(target=monitor_resources, daemon=True)
     monitor_thread.start()
 
-def ai_environment_health_check():
+    def stop_monitoring():
+        # Safe to call more than once: main and atexit may both stop it
+        if stop_event.is_set():
+            return
+        # Let an in-flight sample finish, then drain the queued records to disk
+        stop_event.set()
+        monitor_thread.join(timeout=1)
+        if listener is not None:
+            listener.stop()
+
+    atexit.register(stop_monitoring)
+    return monitor_thread, stop_monitoring
+
+def ai_environment_health_check(system_info, cuda_info, benchmarks):
     """
     Comprehensive health check for AI development environment
     
-    Performs:
+    Summarizes:
     - System diagnostics
     - Library compatibility check
     - Performance benchmarking
     - Recommendations generation
+    
+    Args:
+        system_info (dict): Collected system information
+        cuda_info (dict): CUDA availability details
+        benchmarks (dict): Performance benchmark results
     """
     print("=== AI Development Environment Health Check ===")
 
     # System Information
-    system_info = get_system_info()
     print("\n--- System Information Summary ---")
     print(f"OS: {system_info['OS']}")
     print(f"Python: {system_info['Python Version']}")
@@ -362,7 +648,6 @@ def ai_environment_health_check():
     print(f"Memory: {system_info['Memory']['Total']}")
 
     # CUDA and GPU Check
-    cuda_info = check_cuda_availability()
     print("\n--- CUDA and GPU Status ---")
     print(f"CUDA Available: {cuda_info['CUDA Available']}")
     if cuda_info['CUDA Available']:
@@ -372,14 +657,12 @@ def ai_environment_health_check():
             print(f"  - {device['Name']} (Compute: {device['Compute Capability']})")
 
     # Library Versions
-    library_versions = get_library_versions()
     print("\n--- Key Library Versions ---")
-    for lib, version in library_versions.items():
+    for lib, version in system_info['Libraries'].items():
         print(f"{lib}: {version}")
 
     # Performance Benchmarks
     print("\n--- Performance Benchmarks ---")
-    benchmarks = performance_benchmark()
     for benchmark_name, results in benchmarks.items():
         print(f"\n{benchmark_name}:")
         for key, value in results.items():
@@ -391,14 +674,39 @@ def ai_environment_health_check():
     for recommendation in recommendations:
         print(f"- {recommendation}")
 
-    # Optional: Generate detailed report
-    generate_diagnostic_report(system_info, cuda_info, benchmarks)
-
 def main():
     """Main execution point for diagnostics"""
-    ai_environment_health_check()
-    export_system_info_json()
-    continuous_monitoring()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI development environment diagnostics")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("report", help="print a health check and write a Markdown report (default)")
+    subparsers.add_parser("export", help="export the collected diagnostics as JSON")
+    subparsers.add_parser("monitor", help="log resource usage every 5 minutes until interrupted")
+    args = parser.parse_args()
+
+    if args.command == "monitor":
+        # Run in the foreground until Ctrl+C, then stop the monitor cleanly.
+        # Join in short slices: an untimed join can't be interrupted by
+        # Ctrl+C on Windows before Python 3.14
+        monitor_thread, stop_monitoring = continuous_monitoring()
+        try:
+            while monitor_thread.is_alive():
+                monitor_thread.join(1)
+        except KeyboardInterrupt:
+            stop_monitoring()
+        return
+
+    # Collect once; every consumer below works from the same results
+    system_info = get_system_info()
+    cuda_info = check_cuda_availability()
+    benchmarks = performance_benchmark()
+
+    if args.command == "export":
+        export_system_info_json(system_info, cuda_info, benchmarks)
+    else:
+        ai_environment_health_check(system_info, cuda_info, benchmarks)
+        generate_diagnostic_report(system_info, cuda_info, benchmarks)
 
 if __name__ == "__main__":
     main()